@@ -5,184 +5,263 @@ Updated with new features: Streaming, Authentication, Metrics, Database, Autonom
 """
 
 import os
+import sys
 import json
+import asyncio
+import httpx
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder  # type: ignore[import-untyped]
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Any, Union
+
+# orjson is optional; it parses and serializes several times faster than
+# the standard library, so use it when it is installed
+try:
+    import orjson  # type: ignore[import-not-found]
+
+    def json_loads(data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+    def json_dumps(obj: Any, indent: Optional[int] = None) -> str:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option).decode("utf-8")
+
+    def json_encode(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def json_loads(data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def json_dumps(obj: Any, indent: Optional[int] = None) -> str:
+        return json.dumps(obj, indent=indent)
+
+    def json_encode(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
 
 # Configuration
 BASE_URL = os.getenv("BASE_URL", "http://localhost:5001")
 API_KEY = os.getenv("API_KEY", "your-api-key-here")
 JWT_TOKEN = os.getenv("JWT_TOKEN", "")
 
-def make_request(method: str, endpoint: str, data: Optional[Dict] = None, 
+# (connect, read) timeout in seconds
+REQUEST_TIMEOUT = (3, 30)
+
+# One pooled session for every call so keep-alive reuses the same TCP/TLS
+# connection instead of paying a new handshake per request
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+# Default headers shared by both the sync session and the async client
+_DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "X-API-Key": API_KEY
+}
+SESSION.headers.update(_DEFAULT_HEADERS)
+
+def _request_headers(headers: Optional[Dict] = None) -> Optional[Dict]:
+    """Headers to send on top of the session defaults (only copies when needed)"""
+    if not JWT_TOKEN:
+        return headers
+    auth = {"Authorization": f"Bearer {JWT_TOKEN}"}
+    return {**headers, **auth} if headers else auth
+
+def _encode_body(data: Union[Dict, bytes, None]) -> Optional[bytes]:
+    """Serialize a JSON body; already-encoded bytes are passed through"""
+    if data is None or isinstance(data, bytes):
+        return data
+    return json_encode(data)
+
+def make_request(method: str, endpoint: str, data: Union[Dict, bytes, None] = None, 
                  headers: Optional[Dict] = None, stream: bool = False) -> Any:
     """Helper function to make API requests"""
-    url = f"{BASE_URL}{endpoint}"
-    default_headers = {
-        "Content-Type": "application/json",
-        "X-API-Key": API_KEY
-    }
-    if headers:
-        default_headers.update(headers)
-    
-    if JWT_TOKEN:
-        default_headers["Authorization"] = f"Bearer {JWT_TOKEN}"
-    
-    if method == "GET":
-        response = requests.get(url, headers=default_headers, stream=stream)
-    elif method == "POST":
-        response = requests.post(url, json=data, headers=default_headers, stream=stream)
-    elif method == "PUT":
-        response = requests.put(url, json=data, headers=default_headers)
-    elif method == "DELETE":
-        response = requests.delete(url, headers=default_headers)
-    else:
-        raise ValueError(f"Unsupported method: {method}")
-    
+    response = SESSION.request(
+        method,
+        f"{BASE_URL}{endpoint}",
+        data=_encode_body(data),
+        headers=_request_headers(headers),
+        stream=stream,
+        timeout=REQUEST_TIMEOUT
+    )
     response.raise_for_status()
     
     if stream:
         return response
-    return response.json()
+    return json_loads(response.content)
+
+async def _request(client: httpx.AsyncClient, method: str, endpoint: str,
+                   data: Union[Dict, bytes, None] = None, headers: Optional[Dict] = None) -> Any:
+    """Async helper used by the concurrent driver in main()"""
+    response = await client.request(method, endpoint, content=_encode_body(data),
+                                    headers=_request_headers(headers))
+    response.raise_for_status()
+    return json_loads(response.content)
+
+def create_async_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP/2 client shared by all async examples
+    
+    Over HTTPS the concurrent calls are multiplexed as streams on one TLS
+    connection; plain-HTTP URLs fall back to pooled HTTP/1.1 keep-alive.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        base_url=BASE_URL,
+        headers=_DEFAULT_HEADERS,
+        timeout=httpx.Timeout(REQUEST_TIMEOUT[1], connect=REQUEST_TIMEOUT[0]),
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+    )
 
 def print_response(title: str, response: Any):
     """Pretty print response"""
     print(f"\n{'='*60}")
     print(f"{title}")
     print(f"{'='*60}")
-    print(json.dumps(response, indent=2))
+    print(json_dumps(response, indent=2))
 
 # ============================================================================
 # HEALTH CHECKS
 # ============================================================================
-def test_health_check():
+async def test_health_check(client: httpx.AsyncClient):
     """Test health check endpoint"""
-    response = make_request("GET", "/health")
+    response = await _request(client, "GET", "/health")
     print_response("Health Check", response)
 
 # ============================================================================
 # AUTHENTICATION
 # ============================================================================
-def login():
+async def login(client: httpx.AsyncClient):
     """Login and get JWT token"""
     data = {
         "email": "user@example.com",
         "password": "password123"
     }
-    response = make_request("POST", "/api/auth/login", data=data)
+    response = await _request(client, "POST", "/api/auth/login", data=data)
     global JWT_TOKEN
     JWT_TOKEN = response.get("token", "")
     print_response("Login (JWT Token)", response)
     return JWT_TOKEN
 
-def get_current_user():
+async def get_current_user(client: httpx.AsyncClient):
     """Get current user info using JWT"""
     if not JWT_TOKEN:
         print("Please login first")
         return
-    response = make_request("GET", "/api/auth/me")
+    response = await _request(client, "GET", "/api/auth/me")
     print_response("Current User", response)
 
 # ============================================================================
 # REQUIREMENTS ASSISTANT
 # ============================================================================
-def summarize_requirements():
+async def summarize_requirements(client: httpx.AsyncClient):
     """Summarize requirements document"""
     data = {
         "content": "The system shall allow users to login and manage their profiles. "
                    "Users can update their email addresses and passwords."
     }
-    response = make_request("POST", "/api/requirements/summarize", data=data)
+    response = await _request(client, "POST", "/api/requirements/summarize", data=data)
     print_response("Summarize Requirements", response)
 
-def generate_user_stories():
+async def generate_user_stories(client: httpx.AsyncClient):
     """Generate user stories from requirements"""
     data = {
         "content": "Users need to login and view their dashboard with personalized content."
     }
-    response = make_request("POST", "/api/requirements/generate-user-stories", data=data)
+    response = await _request(client, "POST", "/api/requirements/generate-user-stories", data=data)
     print_response("Generate User Stories", response)
 
-def answer_question():
+async def answer_question(client: httpx.AsyncClient):
     """Answer question using RAG"""
     data = {
         "question": "What are the main features?",
         "context": "The system includes user authentication, profile management, and dashboard features."
     }
-    response = make_request("POST", "/api/requirements/answer-question", data=data)
+    response = await _request(client, "POST", "/api/requirements/answer-question", data=data)
     print_response("Answer Question (RAG)", response)
 
 # ============================================================================
 # STREAMING ENDPOINTS
 # ============================================================================
+_SSE_DATA_PREFIX = b"data: "
+_SSE_DONE = b"[DONE]"
+
 def stream_summarization():
     """Stream requirements summarization"""
     data = {
         "content": "The system shall allow users to login and manage their profiles."
     }
     url = f"{BASE_URL}/api/streaming/summarize-stream"
-    headers = {
-        "Content-Type": "application/json",
-        "X-API-Key": API_KEY,
-        "Accept": "text/event-stream"
-    }
+    headers = {"Accept": "text/event-stream"}
     
     print("\n" + "="*60)
     print("Streaming Summarization (Server-Sent Events)")
     print("="*60)
     
-    response = requests.post(url, json=data, headers=headers, stream=True)
+    response = SESSION.post(url, json=data, headers=headers, stream=True,
+                            timeout=REQUEST_TIMEOUT)
     response.raise_for_status()
     
-    for line in response.iter_lines():
-        if line:
-            decoded = line.decode('utf-8')
-            if decoded.startswith('data: '):
-                data_str = decoded[6:]  # Remove 'data: ' prefix
-                if data_str == '[DONE]':
-                    break
-                try:
-                    chunk = json.loads(data_str)
-                    print(chunk.get('content', ''), end='', flush=True)
-                except json.JSONDecodeError:
-                    pass
-    print("\n")
+    # The default iter_lines chunk size is tiny; read up to 64 KB at a time.
+    # Chunked SSE responses are still delivered as each chunk arrives.
+    # Lines are matched as bytes; only the JSON payload is ever decoded.
+    out = sys.stdout
+    for line in response.iter_lines(chunk_size=65536, decode_unicode=False):
+        if not line.startswith(_SSE_DATA_PREFIX):
+            continue  # Blank event separators and non-data fields
+        payload = line[len(_SSE_DATA_PREFIX):]
+        if payload == _SSE_DONE:
+            break
+        try:
+            chunk = json_loads(payload)
+        except json.JSONDecodeError:
+            continue
+        # Flush every frame so tokens show up as they arrive
+        out.write(chunk.get('content', ''))
+        out.flush()
+    out.write("\n\n")
+    out.flush()
 
 # ============================================================================
 # METRICS
 # ============================================================================
-def get_all_metrics():
+async def get_all_metrics(client: httpx.AsyncClient):
     """Get all metrics"""
-    response = make_request("GET", "/api/metrics")
+    response = await _request(client, "GET", "/api/metrics")
     print_response("All Metrics", response)
 
-def get_model_metrics(model: str = "gpt-4-turbo-preview"):
+async def get_model_metrics(client: httpx.AsyncClient, model: str = "gpt-4-turbo-preview"):
     """Get metrics for specific model"""
-    response = make_request("GET", f"/api/metrics/{model}")
+    response = await _request(client, "GET", f"/api/metrics/{model}")
     print_response(f"Metrics for {model}", response)
 
-def reset_metrics():
+async def reset_metrics(client: httpx.AsyncClient):
     """Reset all metrics"""
-    response = make_request("POST", "/api/metrics/reset")
+    response = await _request(client, "POST", "/api/metrics/reset")
     print_response("Reset Metrics", response)
 
 # ============================================================================
 # DATABASE ENDPOINTS
 # ============================================================================
-def get_user_stories():
+async def get_user_stories(client: httpx.AsyncClient):
     """Get all user stories from database"""
-    response = make_request("GET", "/api/database/user-stories")
+    response = await _request(client, "GET", "/api/database/user-stories")
     print_response("User Stories", response)
 
-def get_requirement_documents():
+async def get_requirement_documents(client: httpx.AsyncClient):
     """Get requirement documents"""
-    response = make_request("GET", "/api/database/requirement-documents")
+    response = await _request(client, "GET", "/api/database/requirement-documents")
     print_response("Requirement Documents", response)
 
 # ============================================================================
 # AUTONOMOUS DEVELOPMENT AGENT
 # ============================================================================
-def analyze_code():
+async def analyze_code(client: httpx.AsyncClient):
     """Analyze code for improvements"""
     data = {
         "code": """public class UserService {
@@ -192,10 +271,10 @@ def analyze_code():
 }""",
         "context": "User service for authentication"
     }
-    response = make_request("POST", "/api/autonomousagent/analyze", data=data)
+    response = await _request(client, "POST", "/api/autonomousagent/analyze", data=data)
     print_response("Code Analysis", response)
 
-def execute_autonomous_workflow():
+async def execute_autonomous_workflow(client: httpx.AsyncClient):
     """Execute full autonomous workflow"""
     data = {
         "code": """public class UserService {
@@ -207,13 +286,13 @@ def execute_autonomous_workflow():
         "repository": "org/repo",
         "filePath": "src/Services/UserService.cs"
     }
-    response = make_request("POST", "/api/autonomousagent/workflow", data=data)
+    response = await _request(client, "POST", "/api/autonomousagent/workflow", data=data)
     print_response("Autonomous Workflow", response)
 
 # ============================================================================
 # RETROSPECTIVE ANALYZER
 # ============================================================================
-def analyze_retrospective():
+async def analyze_retrospective(client: httpx.AsyncClient):
     """Analyze retrospective comments"""
     data = {
         "comments": [
@@ -222,56 +301,63 @@ def analyze_retrospective():
             "Great collaboration this sprint"
         ]
     }
-    response = make_request("POST", "/api/retro/analyze", data=data)
+    response = await _request(client, "POST", "/api/retro/analyze", data=data)
     print_response("Retrospective Analysis", response)
 
 # ============================================================================
 # PHARMACY ASSISTANT
 # ============================================================================
-def generate_patient_education():
+async def generate_patient_education(client: httpx.AsyncClient):
     """Generate patient education materials"""
     data = {
         "medication": "Metformin",
         "dosage": "500mg twice daily",
         "patientAge": 45
     }
-    response = make_request("POST", "/api/pharmacy/patient-education", data=data)
+    response = await _request(client, "POST", "/api/pharmacy/patient-education", data=data)
     print_response("Patient Education", response)
 
 # ============================================================================
 # PUBLISHING ASSISTANT
 # ============================================================================
-def generate_book_review():
+async def generate_book_review(client: httpx.AsyncClient):
     """Generate book review"""
     data = {
         "bookTitle": "The Future of AI",
         "bookContent": "This book explores the potential of artificial intelligence..."
     }
-    response = make_request("POST", "/api/publishing/review", data=data)
+    response = await _request(client, "POST", "/api/publishing/review", data=data)
     print_response("Book Review", response)
 
 def review_pdf_manuscript():
     """Upload PDF for senior agent review"""
-    print_section("PDF Manuscript Review")
+    print("\n" + "="*60)
+    print("PDF Manuscript Review")
+    print("="*60)
     print("Note: This requires a PDF file. Replace 'manuscript.pdf' with your actual file path.")
     
     try:
         with open("manuscript.pdf", "rb") as pdf_file:
-            files = {"pdfFile": ("manuscript.pdf", pdf_file, "application/pdf")}
+            # Stream the file from disk instead of building the whole
+            # multipart body in memory first
+            encoder = MultipartEncoder(
+                fields={"pdfFile": ("manuscript.pdf", pdf_file, "application/pdf")}
+            )
             params = {"genre": "Science Fiction"}
             
             url = f"{BASE_URL}/api/publishing/review-pdf"
-            headers = {"X-API-Key": API_KEY}
+            headers = {"Content-Type": encoder.content_type}
             
-            response = requests.post(
+            response = SESSION.post(
                 url,
-                files=files,
+                data=encoder,
                 params=params,
-                headers=headers
+                headers=headers,
+                timeout=(5, 300)  # Large manuscripts take a while to upload and review
             )
             response.raise_for_status()
             
-            result = response.json()
+            result = json_loads(response.content)
             print_response("Senior Agent Review", result)
             print(f"\nDocument ID: {result.get('documentId')}")
             print(f"Chunks: {result.get('chunkCount')}")
@@ -286,36 +372,43 @@ def review_pdf_manuscript():
 # ============================================================================
 # ADVERTISING ASSISTANT
 # ============================================================================
-def generate_ad_copy():
+async def generate_ad_copy(client: httpx.AsyncClient):
     """Generate ad copy"""
     data = {
         "product": "Smart Watch",
         "targetAudience": "Tech enthusiasts aged 25-40",
         "tone": "Modern and exciting"
     }
-    response = make_request("POST", "/api/advertising/ad-copy", data=data)
+    response = await _request(client, "POST", "/api/advertising/ad-copy", data=data)
     print_response("Ad Copy", response)
 
 # ============================================================================
 # TESTING FEATURES
 # ============================================================================
-def test_rate_limiting():
-    """Test rate limiting by making multiple requests"""
+def test_rate_limiting(request_count: int = 5):
+    """Test rate limiting by sending a burst of concurrent requests"""
     print("\n" + "="*60)
     print("Testing Rate Limiting")
     print("="*60)
-    for i in range(5):
+    url = f"{BASE_URL}/api/metrics"
+    
+    def send(i: int):
         try:
-            response = requests.get(
-                f"{BASE_URL}/api/metrics",
-                headers={"X-API-Key": API_KEY}
-            )
+            return i, SESSION.get(url, timeout=REQUEST_TIMEOUT), None
+        except requests.exceptions.RequestException as e:
+            return i, None, e
+    
+    # The requests overlap on the pooled session, so the burst actually
+    # exercises the limiter; executor.map keeps the output in request order
+    with ThreadPoolExecutor(max_workers=request_count) as executor:
+        for i, response, error in executor.map(send, range(request_count)):
+            if error is not None:
+                print(f"Request {i+1}: Error - {error}")
+                continue
             rate_limit = response.headers.get("X-RateLimit-Limit", "N/A")
             remaining = response.headers.get("X-RateLimit-Remaining", "N/A")
             print(f"Request {i+1}: Status {response.status_code}, "
                   f"Remaining: {remaining}/{rate_limit}")
-        except requests.exceptions.RequestException as e:
-            print(f"Request {i+1}: Error - {e}")
 
 def test_correlation_id():
     """Test correlation ID tracking"""
@@ -331,8 +424,18 @@ def test_correlation_id():
 # ============================================================================
 # MAIN
 # ============================================================================
-def main():
-    """Run all examples"""
+def _report_error(name: str, error: Exception):
+    print(f"\n{name} failed: {error}")
+    response = getattr(error, "response", None)
+    if response is not None:
+        print(f"Response: {response.text}")
+
+async def main():
+    """Run all examples
+    
+    The concurrent examples are isolated: each failure is reported by
+    name and the remaining examples still run.
+    """
     print("="*60)
     print("OpenAI Platform Learning Portfolio - Python Examples")
     print("="*60)
@@ -340,54 +443,75 @@ def main():
     print(f"API Key: {API_KEY[:20]}...")
     print("="*60)
     
+    failures = 0
     try:
-        # Health checks
-        test_health_check()
-        
-        # Authentication
-        login()
-        get_current_user()
-        
-        # Requirements Assistant
-        summarize_requirements()
-        generate_user_stories()
-        answer_question()
+        async with create_async_client() as client:
+            # Authentication (the JWT is needed by the calls below)
+            await login(client)
+            
+            # The remaining endpoints are independent, so run them concurrently
+            examples = [
+                test_health_check,
+                get_current_user,
+                
+                # Requirements Assistant
+                summarize_requirements,
+                generate_user_stories,
+                answer_question,
+                
+                # Metrics
+                get_all_metrics,
+                get_model_metrics,
+                
+                # Database
+                get_user_stories,
+                get_requirement_documents,
+                
+                # Autonomous Agent
+                analyze_code,
+                
+                # Retrospective
+                analyze_retrospective,
+                
+                # Industry examples
+                generate_patient_education,
+                generate_book_review,
+                generate_ad_copy,
+            ]
+            results = await asyncio.gather(
+                *(example(client) for example in examples),
+                return_exceptions=True
+            )
+            for example, result in zip(examples, results):
+                if isinstance(result, Exception):
+                    _report_error(example.__name__, result)
+                    failures += 1
         
-        # Streaming
+        # Streaming (consumes Server-Sent Events, so it runs on its own)
         stream_summarization()
         
-        # Metrics
-        get_all_metrics()
-        get_model_metrics()
-        
-        # Database
-        get_user_stories()
-        get_requirement_documents()
-        
-        # Autonomous Agent
-        analyze_code()
-        
-        # Retrospective
-        analyze_retrospective()
-        
-        # Industry examples
-        generate_patient_education()
-        generate_book_review()
-        review_pdf_manuscript()  # PDF review example
-        generate_ad_copy()
+        # PDF review example
+        review_pdf_manuscript()
         
         # Testing features
         test_rate_limiting()
         test_correlation_id()
         
         print("\n" + "="*60)
-        print("All examples completed successfully!")
+        if failures:
+            print(f"{failures} example(s) failed; see the errors above")
+        else:
+            print("All examples completed successfully!")
         print("="*60)
         
+    except httpx.HTTPError as e:
+        print(f"\nError: {e}")
+        if isinstance(e, httpx.HTTPStatusError):
+            print(f"Response: {e.response.text}")
     except requests.exceptions.RequestException as e:
         print(f"\nError: {e}")
         if hasattr(e, 'response') and e.response is not None:
             print(f"Response: {e.response.text}")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
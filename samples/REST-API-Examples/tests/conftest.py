@@ -0,0 +1,32 @@
+"""Shared fixtures for the REST API example script tests
+
+The scripts have hyphenated file names, so they are loaded by path
+rather than imported.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent
+
+
+def _load(filename: str, module_name: str):
+    spec = importlib.util.spec_from_file_location(module_name, EXAMPLES_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def rag():
+    return _load("rag-embeddings-examples.py", "rag_embeddings_examples")
+
+
+@pytest.fixture
+def unit_rows():
+    rng = np.random.default_rng(0)
+    rows = rng.standard_normal((3000, 64)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
@@ -0,0 +1,93 @@
+"""Embedding response parsing and the on-disk embedding caches"""
+
+import asyncio
+import base64
+import json
+
+import numpy as np
+import pytest
+
+
+def _vector(text, dim=8):
+    rng = np.random.default_rng(sum(text.encode("utf-8")))
+    vec = rng.standard_normal(dim).astype(np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+@pytest.fixture
+def embedded(rag, tmp_path, monkeypatch):
+    """Point the cache at a temporary directory and record every text sent to the API"""
+    monkeypatch.setattr(rag, "EMBEDDING_CACHE_DIR", tmp_path)
+    sent = []
+
+    def fake_create_embeddings(texts):
+        sent.append(list(texts))
+        return np.stack([_vector(text) for text in texts])
+
+    async def fake_create_embeddings_async(client, texts):
+        return fake_create_embeddings(texts)
+
+    monkeypatch.setattr(rag, "create_embeddings", fake_create_embeddings)
+    monkeypatch.setattr(rag, "create_embeddings_async", fake_create_embeddings_async)
+    return sent
+
+
+def test_parse_embeddings_decodes_base64_in_index_order(rag):
+    vectors = [np.array([3.0, 4.0], dtype="<f4"), np.array([0.0, 2.0], dtype="<f4")]
+    body = json.dumps({"data": [
+        {"index": 1, "embedding": base64.b64encode(vectors[1].tobytes()).decode()},
+        {"index": 0, "embedding": base64.b64encode(vectors[0].tobytes()).decode()},
+    ]}).encode("utf-8")
+
+    embeddings = rag._parse_embeddings(body)
+
+    assert embeddings.dtype == np.float32
+    np.testing.assert_allclose(embeddings, [[0.6, 0.8], [0.0, 1.0]])
+
+
+def test_cold_cache_embeds_each_distinct_text_once(rag, embedded):
+    texts = ["alpha", "beta", "alpha"]
+
+    embeddings = rag.create_embeddings_cached(texts)
+
+    assert embedded == [["alpha", "beta"]]
+    np.testing.assert_allclose(embeddings, [_vector(text) for text in texts])
+
+
+def test_repeated_batch_is_memory_mapped(rag, embedded):
+    texts = ["alpha", "beta"]
+    first = rag.create_embeddings_cached(texts)
+
+    second = rag.create_embeddings_cached(texts)
+
+    assert len(embedded) == 1
+    assert isinstance(second, np.memmap)
+    assert not second.flags.writeable
+    np.testing.assert_array_equal(second, first)
+
+
+def test_new_batch_sends_only_unseen_texts(rag, embedded):
+    rag.create_embeddings_cached(["alpha", "beta"])
+
+    embeddings = rag.create_embeddings_cached(["beta", "gamma", "alpha"])
+
+    assert embedded == [["alpha", "beta"], ["gamma"]]
+    np.testing.assert_allclose(embeddings, [_vector(text) for text in ["beta", "gamma", "alpha"]])
+
+
+def test_text_cache_is_per_model(rag, embedded, monkeypatch):
+    rag.create_embeddings_cached(["alpha"])
+    monkeypatch.setattr(rag, "EMBEDDING_MODEL", "text-embedding-3-small")
+
+    rag.create_embeddings_cached(["alpha"])
+
+    assert embedded == [["alpha"], ["alpha"]]
+
+
+def test_async_cache_shares_the_sync_cache(rag, embedded):
+    rag.create_embeddings_cached(["alpha"])
+
+    embeddings = asyncio.run(rag.create_embeddings_cached_async(None, ["alpha", "beta"]))
+
+    assert embedded == [["alpha"], ["beta"]]
+    np.testing.assert_allclose(embeddings, [_vector("alpha"), _vector("beta")])
@@ -0,0 +1,198 @@
+"""EmbeddingIndex search behaviour"""
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("top_k", [0, 5, 1500, 3000, 4000])
+def test_search_batch_matches_search(rag, unit_rows, top_k):
+    # 1500 exceeds SCORE_BLOCK_ROWS, so the first block holds fewer than k rows
+    index = rag.EmbeddingIndex(unit_rows, dtype="float32", backend="numpy")
+    queries = unit_rows[:4] + 0.1
+
+    indices, scores = index.search_batch(queries, top_k)
+
+    assert indices.shape == (len(queries), min(top_k, len(unit_rows)))
+    for i, query in enumerate(queries):
+        expected_indices, expected_scores = index.search(query, top_k)
+        np.testing.assert_array_equal(indices[i], expected_indices)
+        np.testing.assert_allclose(scores[i], expected_scores, rtol=1e-5, atol=1e-6)
+
+
+BACKEND_DTYPES = [
+    ("numpy", "float32"),
+    ("numpy", "float16"),
+    ("numpy", "int8"),
+    ("simsimd", "float32"),
+    ("simsimd", "float16"),
+    ("simsimd", "int8"),
+    ("numba", "float32"),
+    ("numba", "int8"),
+]
+
+
+def _exact_top_k(rows, query, k):
+    rows = rows / np.linalg.norm(rows, axis=1, keepdims=True)
+    scores = rows @ (query / np.linalg.norm(query))
+    order = np.argsort(-scores)[:k]
+    return order, scores[order]
+
+
+def _build(rag, rows, backend, dtype, **kwargs):
+    if backend == "simsimd" and rag.simsimd is None:
+        pytest.skip("simsimd is not installed")
+    if backend == "numba" and rag._dot_rows_kernel is None:
+        pytest.skip("numba is not installed")
+    return rag.EmbeddingIndex(rows, dtype=dtype, backend=backend, **kwargs)
+
+
+@pytest.fixture
+def queries(unit_rows):
+    # Each query sits close to one row, so its best match is unambiguous
+    rng = np.random.default_rng(1)
+    picks = rng.choice(len(unit_rows), 8, replace=False)
+    return unit_rows[picks] + 0.05 * rng.standard_normal((8, unit_rows.shape[1])).astype(np.float32)
+
+
+@pytest.mark.parametrize("backend,dtype", BACKEND_DTYPES)
+def test_search_matches_exact_top_k(rag, unit_rows, queries, backend, dtype):
+    index = _build(rag, unit_rows, backend, dtype)
+    atol = {"float32": 1e-5, "float16": 2e-3, "int8": 2e-2}[dtype]
+
+    for query in queries:
+        expected_indices, expected_scores = _exact_top_k(unit_rows, query, 10)
+        indices, scores = index.search(query, 10)
+
+        assert indices[0] == expected_indices[0]
+        assert len(set(indices) & set(expected_indices)) >= 8
+        np.testing.assert_allclose(scores, np.sort(scores)[::-1])
+        # Every returned score is that row's cosine, up to storage precision
+        exact = _exact_top_k(unit_rows, query, len(unit_rows))
+        cosine = dict(zip(exact[0], exact[1]))
+        np.testing.assert_allclose(scores, [cosine[i] for i in indices], atol=atol)
+        if dtype == "float32":
+            np.testing.assert_array_equal(indices, expected_indices)
+
+
+@pytest.mark.parametrize("backend,dtype", BACKEND_DTYPES)
+def test_search_batch_matches_exact_top_k(rag, unit_rows, queries, backend, dtype):
+    index = _build(rag, unit_rows, backend, dtype)
+
+    indices, scores = index.search_batch(queries, 10)
+
+    assert indices.shape == scores.shape == (len(queries), 10)
+    for row, query in zip(indices, queries):
+        expected_indices, _ = _exact_top_k(unit_rows, query, 10)
+        assert row[0] == expected_indices[0]
+        assert len(set(row) & set(expected_indices)) >= 8
+
+
+@pytest.mark.parametrize("backend,dtype", BACKEND_DTYPES)
+def test_edge_cases(rag, unit_rows, backend, dtype):
+    index = _build(rag, unit_rows[:20], backend, dtype)
+    query = unit_rows[0]
+
+    assert len(index.search(query, 0)[0]) == 0
+    assert index.search_batch(query[np.newaxis], 0)[0].shape == (1, 0)
+    assert len(index.search(query, 50)[0]) == 20
+    assert index.search_batch(query[np.newaxis], 50)[0].shape == (1, 20)
+
+    # A zero query is similar to nothing
+    np.testing.assert_array_equal(index.similarities(np.zeros(64)), np.zeros(20))
+    indices, scores = index.search(np.zeros(64), 3)
+    assert len(indices) == 3
+    np.testing.assert_array_equal(scores, np.zeros(3))
+
+
+@pytest.mark.parametrize("backend,dtype", BACKEND_DTYPES)
+def test_empty_index(rag, backend, dtype):
+    index = _build(rag, np.empty((0, 64), dtype=np.float32), backend, dtype)
+    query = np.ones(64, dtype=np.float32)
+
+    assert len(index) == 0
+    assert len(index.similarities(query)) == 0
+    assert len(index.search(query, 3)[0]) == 0
+    assert index.search_batch(query[np.newaxis], 3)[0].shape == (1, 0)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+def test_rows_need_not_be_unit_length(rag, unit_rows, queries, dtype):
+    scaled = unit_rows * np.linspace(0.5, 3.0, len(unit_rows), dtype=np.float32)[:, np.newaxis]
+    index = rag.EmbeddingIndex(scaled, dtype=dtype, backend="numpy")
+
+    expected_indices, expected_scores = _exact_top_k(unit_rows, queries[0], 5)
+    indices, scores = index.search(queries[0], 5)
+
+    assert indices[0] == expected_indices[0]
+    np.testing.assert_allclose(scores[0], expected_scores[0], atol=2e-2)
+
+
+def test_pruned_search_is_exact(rag, unit_rows, queries):
+    index = _build(rag, unit_rows, "numba", "float32")
+    assert index.scale is None  # unit rows take the pruning path
+
+    for query in queries:
+        expected_indices, expected_scores = _exact_top_k(unit_rows, query, 10)
+        indices, scores = index.search(query, 10)
+        np.testing.assert_array_equal(indices, expected_indices)
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-4, atol=1e-5)
+
+
+def test_quantize_int8_round_trip(rag, unit_rows):
+    quantized, scale = rag.quantize_int8(unit_rows)
+
+    assert quantized.dtype == np.int8
+    assert scale.shape == (len(unit_rows),)
+    assert np.abs(quantized).max() == 127
+    restored = quantized * scale[:, np.newaxis]
+    # Rounding moves each value by at most half a quantization step
+    assert np.all(np.abs(restored - unit_rows) <= scale[:, np.newaxis] / 2 + 1e-7)
+
+    zeros, zero_scale = rag.quantize_int8(np.zeros((2, 4)))
+    np.testing.assert_array_equal(zeros, 0)
+    np.testing.assert_array_equal(zero_scale, 1.0)
+
+
+def test_top_k_indices(rag):
+    scores = np.array([0.1, 0.9, 0.5, 0.7], dtype=np.float32)
+
+    np.testing.assert_array_equal(rag.top_k_indices(scores, 2), [1, 3])
+    np.testing.assert_array_equal(rag.top_k_indices(scores, 4), [1, 3, 2, 0])
+    np.testing.assert_array_equal(rag.top_k_indices(scores, 10), [1, 3, 2, 0])
+    assert len(rag.top_k_indices(scores, 0)) == 0
+
+
+MATRYOSHKA_MODEL = "text-embedding-3-small"
+
+
+def test_prefix_rerank_scores_are_exact(rag, unit_rows, queries):
+    full = rag.EmbeddingIndex(unit_rows, dtype="float32", backend="numpy")
+    index = rag.EmbeddingIndex(unit_rows, dtype="float32", backend="numpy",
+                               prefix_dims=16, model=MATRYOSHKA_MODEL)
+
+    for query in queries:
+        indices, scores = index.search(query, 5)
+        np.testing.assert_allclose(scores, full.similarities(query)[indices], rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose(scores, np.sort(scores)[::-1])
+
+    batch_indices, _ = index.search_batch(queries, 5)
+    for row, query in zip(batch_indices, queries):
+        np.testing.assert_array_equal(row, index.search(query, 5)[0])
+
+
+def test_prefix_rerank_over_whole_shortlist_is_exact(rag, unit_rows, queries):
+    # A shortlist covering every row leaves nothing for the prefix to miss
+    rows = unit_rows[:40]
+    index = rag.EmbeddingIndex(rows, dtype="float32", backend="numpy",
+                               prefix_dims=16, model=MATRYOSHKA_MODEL)
+
+    for query in queries:
+        expected_indices, _ = _exact_top_k(rows, query, 10)
+        np.testing.assert_array_equal(index.search(query, 10)[0], expected_indices)
+
+
+def test_prefix_dims_rejected_for_non_matryoshka_models(rag, unit_rows):
+    with pytest.raises(ValueError):
+        rag.EmbeddingIndex(unit_rows, prefix_dims=16)
+    with pytest.raises(ValueError):
+        rag.EmbeddingIndex(unit_rows, prefix_dims=16, model="text-embedding-ada-002")
@@ -0,0 +1,92 @@
+"""HNSWIndex approximate search and its on-disk graph cache"""
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def hnswlib(rag):
+    if rag.hnswlib is None:
+        pytest.skip("hnswlib is not installed")
+    return rag.hnswlib
+
+
+@pytest.fixture
+def rows():
+    rows = np.random.default_rng(0).standard_normal((500, 32)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def queries(rows):
+    rng = np.random.default_rng(1)
+    return rows[rng.choice(len(rows), 10, replace=False)] + 0.1 * rng.standard_normal((10, 32)).astype(np.float32)
+
+
+def _exact_top_k(rows, query, k):
+    scores = rows @ (query / np.linalg.norm(query))
+    order = np.argsort(-scores)[:k]
+    return order, scores[order]
+
+
+def _recall(found, expected):
+    return len(set(found) & set(expected)) / len(expected)
+
+
+def test_search_matches_exact_top_k(rag, hnswlib, rows, queries):
+    index = rag.HNSWIndex(rows, ef=100, cache=False)
+
+    recalls = []
+    for query in queries:
+        expected_indices, expected_scores = _exact_top_k(rows, query, 5)
+        indices, scores = index.search(query, 5)
+        assert len(indices) == 5
+        # Scores are true cosines of the returned rows, best first
+        np.testing.assert_allclose(scores, rows[indices] @ (query / np.linalg.norm(query)), atol=1e-5)
+        np.testing.assert_allclose(scores, np.sort(scores)[::-1])
+        recalls.append(_recall(indices, expected_indices))
+    assert np.mean(recalls) >= 0.9
+
+
+def test_search_batch_matches_search(rag, hnswlib, rows, queries):
+    index = rag.HNSWIndex(rows, ef=100, cache=False)
+
+    indices, scores = index.search_batch(queries, 5)
+
+    assert indices.shape == scores.shape == (len(queries), 5)
+    for row, query in zip(indices, queries):
+        assert _recall(row, _exact_top_k(rows, query, 5)[0]) >= 0.8
+        np.testing.assert_array_equal(row, index.search(query, 5)[0])
+
+
+def test_top_k_larger_than_index(rag, hnswlib, rows, queries):
+    index = rag.HNSWIndex(rows[:20], cache=False)
+
+    indices, _ = index.search(queries[0], 50)
+    assert sorted(indices) == list(range(20))
+    assert index.search_batch(queries, 50)[0].shape == (len(queries), 20)
+    assert len(index.search(queries[0], 0)[0]) == 0
+
+
+def test_built_graph_is_loaded_from_cache(rag, hnswlib, rows, queries, tmp_path, monkeypatch):
+    monkeypatch.setattr(rag, "EMBEDDING_CACHE_DIR", tmp_path)
+    built = rag.HNSWIndex(rows)
+    assert len(list(tmp_path.glob("*.hnsw"))) == 1
+
+    calls = []
+    real_index = hnswlib.Index
+
+    class RecordingIndex:
+        def __init__(self, *args, **kwargs):
+            self._index = real_index(*args, **kwargs)
+
+        def __getattr__(self, name):
+            calls.append(name)
+            return getattr(self._index, name)
+
+    monkeypatch.setattr(rag.hnswlib, "Index", RecordingIndex)
+    loaded = rag.HNSWIndex(rows)
+
+    assert "load_index" in calls
+    assert "add_items" not in calls
+    np.testing.assert_array_equal(loaded.search_batch(queries, 5)[0], built.search_batch(queries, 5)[0])
@@ -0,0 +1,65 @@
+"""Retry policy of the async OpenAI client (_post_async)"""
+
+import asyncio
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def sleeps(rag, monkeypatch):
+    """Record the backoff delays instead of waiting them out"""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(rag.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def _post(rag, responses, attempts):
+    """POST through _post_async to a transport replaying responses (the last one repeats)"""
+    def handler(request):
+        attempts.append(request)
+        return responses[min(len(attempts), len(responses)) - 1]
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler),
+                                     base_url="https://api.test") as client:
+            return await rag._post_async(client, "/embeddings", b"{}")
+
+    return asyncio.run(run())
+
+
+def test_throttled_request_succeeds_after_retry(rag, sleeps):
+    attempts = []
+    response = _post(rag, [httpx.Response(429), httpx.Response(200)], attempts)
+
+    assert response.status_code == 200
+    assert len(attempts) == 2
+    assert sleeps == [rag.RETRY_BACKOFF]
+
+
+def test_retry_after_takes_precedence_over_backoff(rag, sleeps):
+    _post(rag, [httpx.Response(429, headers={"Retry-After": "7"}), httpx.Response(200)], [])
+
+    assert sleeps == [7.0]
+
+
+def test_persistent_server_error_raises_after_max_retries(rag, sleeps):
+    attempts = []
+    with pytest.raises(httpx.HTTPStatusError):
+        _post(rag, [httpx.Response(503)], attempts)
+
+    assert len(attempts) == rag.MAX_RETRIES + 1
+    assert sleeps == [rag.RETRY_BACKOFF * 2 ** attempt for attempt in range(rag.MAX_RETRIES)]
+
+
+def test_client_error_is_not_retried(rag, sleeps):
+    attempts = []
+    with pytest.raises(httpx.HTTPStatusError):
+        _post(rag, [httpx.Response(400), httpx.Response(200)], attempts)
+
+    assert len(attempts) == 1
+    assert sleeps == []
@@ -0,0 +1,106 @@
+"""LSHSemanticCache and the Corpus search paths that use it"""
+
+import numpy as np
+import pytest
+
+DIM = 64
+
+
+def _documents(prefix, count):
+    return [{"title": f"{prefix} {i}", "content": f"{prefix} document {i}"} for i in range(count)]
+
+
+def _rows(seed, count):
+    rows = np.random.default_rng(seed).standard_normal((count, DIM)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def _rotated(cache, vec, cosine):
+    """A unit vector at the given cosine to vec that hashes to vec's bucket
+
+    The offset direction is orthogonal to vec and to every hyperplane, so
+    each projection is just scaled by the cosine and keeps its sign.
+    """
+    basis, _ = np.linalg.qr(np.vstack([vec, cache.planes]).T)
+    offset = np.random.default_rng(7).standard_normal(DIM)
+    offset -= basis @ (basis.T @ offset)
+    offset /= np.linalg.norm(offset)
+    unit = vec / np.linalg.norm(vec)
+    return (cosine * unit + np.sqrt(1 - cosine ** 2) * offset).astype(np.float32)
+
+
+@pytest.fixture
+def corpus(rag):
+    return rag.Corpus(_documents("Doc", 30), _rows(0, 30), dtype="float32",
+                      cache=rag.LSHSemanticCache(DIM))
+
+
+@pytest.fixture
+def query(rag):
+    return _rows(1, 1)[0]
+
+
+def test_exact_text_hit_skips_embedding(rag, corpus, query, monkeypatch):
+    first = rag.find_similar_documents("how do I log in?", corpus, top_k=3, query_embedding=query)
+
+    def no_embedding(text):
+        raise AssertionError("an exact repeat must not be embedded")
+
+    monkeypatch.setattr(rag, "create_embedding", no_embedding)
+    assert rag.find_similar_documents("how do I log in?", corpus, top_k=3) == first
+
+
+def test_near_duplicate_hit_at_threshold_and_miss_below(rag, query):
+    cache = rag.LSHSemanticCache(DIM, threshold=0.95)
+    results = [({"title": "cached"}, 0.9)]
+    cache.put("original", query, 1, results)
+
+    close = _rotated(cache, query, 0.951)
+    far = _rotated(cache, query, 0.94)
+    assert cache._bucket(close) == cache._bucket(far) == cache._bucket(query / np.linalg.norm(query))
+
+    assert cache.get("paraphrase", close, 1) == results
+    assert cache.get("unrelated", far, 1) is None
+
+
+def test_smaller_top_k_served_from_larger_entry(rag, corpus, query):
+    cached = corpus.search(query, 5, query="question")
+
+    assert corpus.cache.get("question", None, 3) == cached[:3]
+    assert corpus.cache.get("question", query, 3) == cached[:3]
+    # A larger top_k than was cached is a miss
+    assert corpus.cache.get("question", None, 6) is None
+
+
+def test_each_corpus_keeps_its_own_cache(rag, query):
+    first = rag.Corpus(_documents("First", 10), _rows(2, 10), dtype="float32",
+                       cache=rag.LSHSemanticCache(DIM))
+    second = rag.Corpus(_documents("Second", 10), _rows(3, 10), dtype="float32",
+                        cache=rag.LSHSemanticCache(DIM))
+
+    first_results = first.search(query, 3, query="same question")
+    second_results = second.search(query, 3, query="same question")
+
+    assert all(doc["title"].startswith("First") for doc, _ in first_results)
+    assert all(doc["title"].startswith("Second") for doc, _ in second_results)
+    assert rag.find_similar_documents("same question", second, top_k=3) == second_results
+
+
+def test_search_batch_searches_only_misses(rag, corpus, monkeypatch):
+    queries = _rows(4, 3)
+    cached = corpus.search(queries[0], 3, query="seen")
+
+    searched = []
+    search_batch = corpus.index.search_batch
+
+    def recording_search_batch(embeddings, top_k):
+        searched.append(len(embeddings))
+        return search_batch(embeddings, top_k)
+
+    monkeypatch.setattr(corpus.index, "search_batch", recording_search_batch)
+    results = corpus.search_batch(queries, 3, ["seen", "new one", "new two"])
+
+    assert searched == [2]
+    assert results[0] == cached
+    expected = rag.Corpus(corpus.meta, corpus.index).search_batch(queries[1:], 3)
+    assert results[1:] == expected